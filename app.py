@@ -1,10 +1,12 @@
 import streamlit as st
-import plotly_express as px
 import pandas as pd
 import io
-import plotly.graph_objects as go
-import seaborn as sns
-import matplotlib.pyplot as plt
+
+from cache_utils import LRUCache
+from engines import available_engines, make_engine
+from figures import cached_figure
+from startup import HEAVY_MODULES, duckdb_connection, warm_up
+from timeseries import is_timeseries, render_timeseries_chart
 # from pandas_profiling import ProfileReport 
 # from streamlit_pandas_profiling import st_profile_report
 
@@ -14,6 +16,14 @@ st.set_option('deprecation.showfileUploaderEncoding', False)
 # title of the app
 st.title("DataSense")
 
+# built figures, keyed by dataset and chart settings
+if "figure_cache" not in st.session_state:
+    st.session_state.figure_cache = LRUCache(max_entries=32)
+
+# backends for the Describe / Missing / Correlation tools, per dataset
+if "engines" not in st.session_state:
+    st.session_state.engines = LRUCache(max_entries=3)
+
 # Add a sidebar
 st.sidebar.subheader("Visualization Settings")
 
@@ -22,6 +32,9 @@ uploaded_file = st.sidebar.file_uploader(
                         label="Upload your CSV or Excel file. (200MB max)",
                          type=['csv', 'xlsx'])
 
+# load plotly/duckdb (and the Correlation plotting stack) in the background
+warm_up(HEAVY_MODULES + ["matplotlib.pyplot", "seaborn"])
+
 global df
 if uploaded_file is not None:
     print(uploaded_file)
@@ -50,6 +63,14 @@ try:
     non_numeric_columns = list(df.select_dtypes(['object']).columns)
     non_numeric_columns.append(None)
     print(non_numeric_columns)
+
+    engine_name = st.sidebar.selectbox('Engine', options=available_engines())
+    data_version = (uploaded_file.name, uploaded_file.size)
+    engine = st.session_state.engines.get((data_version, engine_name))
+    if engine is None:
+        engine = make_engine(engine_name, df, con=duckdb_connection())
+        st.session_state.engines.put((data_version, engine_name), engine)
+
     # column filter data 
     filtered = st.multiselect("Filter columns", options=list(df.columns), default=list(df.columns))
     st.write(df[filtered])
@@ -64,23 +85,25 @@ try:
     
     elif select=='Describe data':
         
-        buffer = io.StringIO()
-        s= df.describe()
+        s= engine.describe()
         st.table(s)
 
     elif select== 'Find Missing value':
-        buffer = io.StringIO()
-        s= df.isnull().sum()
+        s= engine.missing_counts()
         st.table(s)
 
     elif select == 'Correlation':
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         fig, ax = plt.subplots(figsize=(10,10))
-        sns.heatmap(df.corr(), annot=True, ax=ax, cmap='coolwarm')
+        sns.heatmap(engine.corr(), annot=True, ax=ax, cmap='coolwarm')
         st.pyplot(fig)
 
 
 #graph
-   
+    figure_cache = st.session_state.figure_cache
+
     chart_select= st.sidebar.selectbox(
                     label='Select the chart type',
                      options=['Scatterplots','Lineplot','Histogram','Boxplot','Barchart'])
@@ -90,7 +113,7 @@ try:
         st.sidebar.subheader("Scatterplot Settings")
         x_values = st.sidebar.selectbox('X axis', options= df.columns)
         y_values = st.sidebar.selectbox('Y axis', options= df.columns)
-        plot = px.scatter(data_frame=df, x=x_values, y=y_values)
+        plot = cached_figure(figure_cache, data_version, df, "Scatter", x=x_values, y=y_values)
         #Display the chart
         st.plotly_chart(plot)
 
@@ -99,8 +122,14 @@ try:
         st.sidebar.subheader("Line Plot Settings")
         x_values = st.sidebar.selectbox('X axis', options=df.columns)
         y_values = st.sidebar.selectbox('Y axis', options=df.columns)
-        plot = px.line(data_frame=df, x=x_values, y=y_values)
-        st.plotly_chart(plot)
+        if is_timeseries(df, x_values, y_values):
+            con = duckdb_connection()
+            con.register("data", df)
+            render_timeseries_chart(con, "data", x_values, y_values,
+                                    version=data_version, cache=figure_cache)
+        else:
+            plot = cached_figure(figure_cache, data_version, df, "Line", x=x_values, y=y_values)
+            st.plotly_chart(plot)
     
 
 
@@ -109,14 +138,14 @@ try:
         x = st.sidebar.selectbox("X axis", options=df.columns)
         y = st.sidebar.selectbox("Y axis", options=df.columns)
         #color_value = st.sidebar.selectbox("Color", options=non_numeric_columns)
-        plot = px.box(data_frame=df, x=x, y=y)
+        plot = cached_figure(figure_cache, data_version, df, "Box", x=x, y=y)
         st.plotly_chart(plot)
 
     elif chart_select == 'Barchart':
         st.sidebar.subheader("Barchart Settings")
         x = st.sidebar.selectbox("X axis", options=df.columns)
         y = st.sidebar.selectbox("Y axis", options=df.columns)
-        plot = px.bar(data_frame=df, x=x, y=y)
+        plot = cached_figure(figure_cache, data_version, df, "Bar", x=x, y=y)
         st.plotly_chart(plot)
 
     
@@ -127,7 +156,7 @@ try:
         bin_size = st.sidebar.slider("Number of Bins", min_value=10,
                                      max_value=100, value=40)
         #color_value = st.sidebar.selectbox("Color", options=non_numeric_columns)
-        plot = px.histogram(x=x, data_frame=df)
+        plot = cached_figure(figure_cache, data_version, df, "Histogram", x=x, bins=bin_size)
         st.plotly_chart(plot)
 
 
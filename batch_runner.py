@@ -0,0 +1,238 @@
+"""Run a saved SQL notebook over many files, headless.
+
+Each input file is loaded the same way the apps load uploads and
+registered in DuckDB as `data`, exactly as in the v4 SQL Lab. Every query
+in the notebook is then written to <output-dir>/<file>/<query>.<format>.
+Files are spread over a process pool. Each file gets a fresh in-memory
+DuckDB connection, so tables or views a notebook creates never leak into
+the next file.
+
+A notebook is the JSON exported from the v4 query history
+([{"name": ..., "query": ...}, ...]) or a .sql file of `;`-separated
+statements. Statements that return no rows (CREATE, SET, ...) are run
+but write no file.
+
+Usage:
+    python batch_runner.py notebook.json extracts/*.csv -o results --workers 8
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+OUTPUT_FORMATS = ["parquet", "csv"]
+
+# Rows per Arrow batch when streaming a result to its output file
+BATCH_ROWS = 100_000
+
+_threads = 1
+
+
+# -----------------------------
+# Notebook and input loading
+# -----------------------------
+def load_notebook(path: Path):
+    text = path.read_text(encoding="utf-8")
+
+    if path.suffix == ".json":
+        entries = json.loads(text)
+    else:
+        import duckdb
+
+        # DuckDB's own splitter, so `;` inside literals and comments is kept
+        entries = [{"query": statement.query} for statement in duckdb.extract_statements(text)]
+
+    queries, seen = [], {}
+    for i, entry in enumerate(entries, 1):
+        query = entry["query"].strip().rstrip(";").strip()
+        if query:
+            name = re.sub(r"[^\w.-]+", "_", entry.get("name") or f"query_{i}")
+            # Repeated names get a suffix, as in output_dirs
+            seen[name] = seen.get(name, 0) + 1
+            queries.append((name if seen[name] == 1 else f"{name}_{seen[name]}", query))
+    return queries
+
+
+def load_file(path: str):
+    # Same readers as the apps' upload handling
+    if path.endswith(".csv"):
+        return pd.read_csv(path)
+    return pd.read_excel(path)
+
+
+def expand_inputs(patterns):
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) or [pattern]
+        paths.extend(match for match in matches if match not in paths)
+    return paths
+
+
+def output_dirs(paths, output_dir: Path):
+    # One folder per input, disambiguating repeated file names
+    dirs, seen = {}, {}
+    for path in paths:
+        stem = Path(path).stem
+        seen[stem] = seen.get(stem, 0) + 1
+        dirs[path] = output_dir / (stem if seen[stem] == 1 else f"{stem}_{seen[stem]}")
+    return dirs
+
+
+# -----------------------------
+# Workers
+# -----------------------------
+def init_worker(threads: int):
+    global _threads
+    _threads = int(threads)
+
+
+def connect():
+    import duckdb
+
+    con = duckdb.connect(database=":memory:")
+    con.execute(f"SET threads TO {_threads}")
+    return con
+
+
+def write_result(con, relation, target: Path, output_format: str):
+    """Stream a query result into its output file and return the row count.
+
+    The result is passed to the writer as Arrow batches and counted on the
+    way through, so the written file is never read back.
+    """
+    import pyarrow as pa
+
+    reader = relation.to_arrow_reader(BATCH_ROWS)
+    rows = 0
+
+    def batches():
+        nonlocal rows
+        for batch in reader:
+            rows += batch.num_rows
+            yield batch
+
+    # The writer runs on a cursor: `con` is busy producing the batches
+    stream = pa.RecordBatchReader.from_batches(reader.schema, batches())
+    written = con.cursor().from_arrow(stream)
+    if output_format == "csv":
+        written.write_csv(str(target), header=True)
+    else:
+        written.write_parquet(str(target))
+    return rows
+
+
+def run_file(path: str, out_dir: str, queries, output_format: str):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    try:
+        data = load_file(path)
+    except Exception as e:
+        return [{
+            "file": path, "query": None, "rows": None,
+            "seconds": time.perf_counter() - start, "error": f"load failed: {e}"
+        }]
+    load_seconds = time.perf_counter() - start
+
+    results = [{"file": path, "query": "<load>", "rows": None,
+                "seconds": load_seconds, "error": None}]
+    # A fresh catalog per file: nothing a notebook creates outlives the file
+    with connect() as con:
+        con.register("data", data)
+        for name, query in queries:
+            start = time.perf_counter()
+            try:
+                # Run the statement as written; wrapping it in COPY (...) breaks
+                # DESCRIBE/SHOW/PRAGMA and queries ending in a `--` comment
+                relation = con.sql(query)
+                rows = None
+                if relation is not None:
+                    target = out_dir / f"{name}.{output_format}"
+                    rows = write_result(con, relation, target, output_format)
+                error = None
+            except Exception as e:
+                rows, error = None, str(e)
+
+            results.append({"file": path, "query": name, "rows": rows,
+                            "seconds": time.perf_counter() - start, "error": error})
+    return results
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("notebook", type=Path, help="saved queries (.json or .sql)")
+    parser.add_argument("inputs", nargs="+", help="CSV/Excel files or glob patterns")
+    parser.add_argument("-o", "--output-dir", type=Path, default=Path("batch_results"))
+    parser.add_argument("--format", choices=list(OUTPUT_FORMATS), default="parquet")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--threads-per-worker",
+        type=int,
+        default=None,
+        help="DuckDB threads per worker (default: CPUs / workers)"
+    )
+    args = parser.parse_args()
+
+    queries = load_notebook(args.notebook)
+    paths = expand_inputs(args.inputs)
+    if not queries or not paths:
+        sys.exit("Nothing to run: the notebook has no queries or no inputs matched.")
+
+    workers = max(1, min(args.workers, len(paths)))
+    threads = args.threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+    dirs = output_dirs(paths, args.output_dir)
+
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(threads,)) as pool:
+        futures = [
+            pool.submit(run_file, path, str(dirs[path]), queries, args.format)
+            for path in paths
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            file_results = future.result()
+            results.extend(file_results)
+            failed = sum(r["error"] is not None for r in file_results)
+            print(f"[{done}/{len(paths)}] {file_results[0]['file']}"
+                  + (f" ({failed} failed)" if failed else ""))
+    elapsed = time.perf_counter() - started
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    summary_path = args.output_dir / "summary.csv"
+    with open(summary_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["file", "query", "rows", "seconds", "error"])
+        writer.writeheader()
+        writer.writerows(results)
+
+    errors = [r for r in results if r["error"] is not None]
+    query_seconds = {}
+    for r in results:
+        if r["query"] is not None and r["error"] is None:
+            query_seconds[r["query"]] = query_seconds.get(r["query"], 0) + r["seconds"]
+
+    print(f"\n{len(paths)} files × {len(queries)} queries in {elapsed:.1f}s "
+          f"with {workers} workers ({threads} DuckDB threads each)")
+    for name, seconds in sorted(query_seconds.items(), key=lambda item: -item[1]):
+        print(f"  {name:<32}{seconds:>10.2f}s total")
+    print(f"Summary written to {summary_path}")
+
+    if errors:
+        print(f"{len(errors)} step(s) failed, see the summary for details")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Startup benchmark for the DataSense entry points.
+
+For each app, measures in fresh interpreters:
+
+- import time: the app's module-level imports
+- first render: one headless run of the script (no upload) via AppTest,
+  with the background warm-up disabled
+- warm-up: how long the app's background preload (its `warm_up(...)`
+  module list) takes
+
+Usage:
+    python bench_startup.py [--repeat 5] [--budget-ms 1500] [app.py ...]
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+ENTRY_POINTS = [
+    "app.py",
+    "data_analyzer_v2.py",
+    "data_analyzer_v3.py",
+    "data_analyzer_v4.py"
+]
+
+IMPORT_SNIPPET = """
+import importlib, json, sys, time
+modules = json.loads(sys.argv[1])
+start = time.perf_counter()
+for name in modules:
+    importlib.import_module(name)
+print(json.dumps(time.perf_counter() - start))
+"""
+
+# streamlit itself is imported before the clock starts
+RENDER_SNIPPET = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "errors": [str(e.value) for e in at.exception]}))
+"""
+
+WARM_UP_SNIPPET = """
+import json, sys, time
+from startup import warm_up
+modules = json.loads(sys.argv[1])
+start = time.perf_counter()
+warm_up(modules).join()
+print(json.dumps(time.perf_counter() - start))
+"""
+
+
+def top_level_imports(path: Path):
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        modules.extend(name for name in names if name not in modules)
+    return modules
+
+
+def warm_up_modules(path: Path):
+    """The module list the script passes to warm_up(), HEAVY_MODULES if none."""
+    from startup import HEAVY_MODULES
+
+    for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id == "warm_up" and node.args):
+            # e.g. warm_up(HEAVY_MODULES + ["matplotlib.pyplot", "seaborn"])
+            expr = ast.Expression(node.args[0])
+            return eval(compile(expr, str(path), "eval"), {"HEAVY_MODULES": HEAVY_MODULES})
+    return HEAVY_MODULES
+
+
+def run_snippet(snippet, *args, warm_up=False):
+    # A daemon warm-up thread still importing at interpreter exit aborts
+    # the process, so it only runs where the snippet joins it
+    env = dict(os.environ, DATASENSE_WARMUP="1" if warm_up else "0")
+    out = subprocess.run(
+        [sys.executable, "-c", snippet, *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure(entry_point, repeat):
+    modules = top_level_imports(ROOT / entry_point)
+
+    import_times = [run_snippet(IMPORT_SNIPPET, json.dumps(modules)) for _ in range(repeat)]
+    renders = [run_snippet(RENDER_SNIPPET, entry_point) for _ in range(repeat)]
+    warm_ups = [
+        run_snippet(WARM_UP_SNIPPET, json.dumps(warm_up_modules(ROOT / entry_point)), warm_up=True)
+        for _ in range(repeat)
+    ]
+
+    return {
+        "entry_point": entry_point,
+        "import_ms": statistics.median(import_times) * 1000,
+        "first_render_ms": statistics.median(r["seconds"] for r in renders) * 1000,
+        "warm_up_ms": statistics.median(warm_ups) * 1000,
+        "errors": renders[-1]["errors"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("entry_points", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=None,
+        help="exit non-zero if any first render (median) exceeds this"
+    )
+    args = parser.parse_args()
+
+    results = [measure(entry_point, args.repeat) for entry_point in args.entry_points]
+
+    print(f"{'entry point':<24}{'imports (ms)':>14}{'first render (ms)':>20}{'warm-up (ms)':>15}")
+    for r in results:
+        print(f"{r['entry_point']:<24}{r['import_ms']:>14.0f}"
+              f"{r['first_render_ms']:>20.0f}{r['warm_up_ms']:>15.0f}")
+        for error in r["errors"]:
+            print(f"    error: {error}")
+    print("warm-up runs in the background after the first render")
+
+    if args.budget_ms is not None:
+        over = [r for r in results if r["first_render_ms"] > args.budget_ms]
+        for r in over:
+            print(f"{r['entry_point']} is over the {args.budget_ms:.0f} ms budget")
+        if over:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+import functools
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from cache_utils import LRUCache
+
+# -----------------------------
+# Index settings
+# -----------------------------
+HIST_BINS = 40
+
+# Less frequent categories share one "(other)" bitmap
+MAX_CATEGORIES = 30
+OTHER_LABEL = "(other)"
+
+
+# -----------------------------
+# Packed bitmaps
+# -----------------------------
+# Row masks are packed into uint64 words: combining selections is a word-wise
+# AND and counting is a popcount, so no per-row array is touched on update
+def _pack(mask):
+    packed = np.packbits(mask)
+    padding = np.zeros(-len(packed) % 8, dtype=np.uint8)
+    return np.concatenate([packed, padding]).view(np.uint64)
+
+
+def _stack(bitmaps, n_rows):
+    if not bitmaps:
+        return np.empty((0, (n_rows + 63) // 64), dtype=np.uint64)
+    return np.stack(bitmaps)
+
+
+def _count(bitmap, mask=None):
+    # Rows set in the bitmap, optionally only those also set in `mask`
+    words = bitmap if mask is None else bitmap & mask
+    return int(np.bitwise_count(words).sum(dtype=np.int64))
+
+
+# -----------------------------
+# Column indexes
+# -----------------------------
+class CategoryIndex:
+    """Dictionary-encoded column with one packed bitmap per category."""
+
+    kind = "category"
+
+    def __init__(self, values: pd.Series, max_categories=MAX_CATEGORIES):
+        codes, uniques = pd.factorize(values)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        top = np.argsort(-counts, kind="stable")[:max_categories]
+        self.n_rows = len(codes)
+
+        self.labels = [str(uniques[i]) for i in top]
+        bitmaps = [_pack(codes == i) for i in top]
+
+        if len(uniques) > len(top):
+            in_top = np.zeros(len(uniques), dtype=bool)
+            in_top[top] = True
+            # A real category may already be called "(other)"
+            other = OTHER_LABEL
+            while other in self.labels:
+                other = f"({other})"
+            self.labels.append(other)
+            bitmaps.append(_pack((codes >= 0) & ~in_top[codes]))
+
+        self.bitmaps = _stack(bitmaps, self.n_rows)
+
+    def select(self, labels):
+        positions = [self.labels.index(label) for label in labels if label in self.labels]
+        if not positions:
+            return np.zeros(self.bitmaps.shape[1], dtype=np.uint64)
+        return np.bitwise_or.reduce(self.bitmaps[positions])
+
+    def aggregate(self, mask=None):
+        counts = np.array([_count(bitmap, mask) for bitmap in self.bitmaps], dtype=np.int64)
+        return pd.DataFrame({"label": self.labels, "count": counts})
+
+
+class NumericIndex:
+    """Sorted row order for range lookups plus one packed bitmap per histogram bin.
+
+    Datetime columns are indexed as nanoseconds since the epoch, in the
+    wall-clock time the charts show; to_axis/from_axis convert for plotly.
+    """
+
+    kind = "numeric"
+
+    def __init__(self, values: pd.Series, bins=HIST_BINS):
+        self.is_datetime = pd.api.types.is_datetime64_any_dtype(values)
+        if self.is_datetime:
+            if values.dt.tz is not None:
+                values = values.dt.tz_localize(None)
+            stamps = values.to_numpy("datetime64[ns]")
+            data = stamps.astype(np.int64).astype(np.float64)
+            data[np.isnat(stamps)] = np.nan
+        else:
+            data = values.to_numpy(dtype="float64", na_value=np.nan)
+        valid = ~np.isnan(data)
+
+        # NaN sorts last, so the first n_valid positions are searchable
+        self.order = np.argsort(data, kind="stable").astype(np.int32)
+        self.n_valid = int(valid.sum())
+        self.sorted = data[self.order[:self.n_valid]]
+        self.n_rows = len(data)
+
+        low = self.sorted[0] if self.n_valid else 0.0
+        high = self.sorted[-1] if self.n_valid else 1.0
+        if high == low:
+            high = low + 1.0
+        self.edges = np.linspace(low, high, bins + 1)
+
+        # 0 is reserved for missing values, bins are 1..bins
+        codes = np.clip(np.searchsorted(self.edges, data, side="right"), 1, bins)
+        codes = np.where(valid, codes, 0)
+        self.bitmaps = _stack([_pack(codes == k) for k in range(1, bins + 1)], self.n_rows)
+
+        # Bin k holds sorted positions bin_starts[k]:bin_starts[k + 1]
+        self.bin_starts = np.searchsorted(self.sorted, self.edges, side="left")
+        self.bin_starts[-1] = self.n_valid
+
+    def select(self, low, high):
+        start = np.searchsorted(self.sorted, low, side="left")
+        end = np.searchsorted(self.sorted, high, side="right")
+
+        # Bins wholly inside the range come from their bitmaps; only rows of
+        # the partly covered edge bins are set one by one
+        first = np.searchsorted(self.bin_starts, start, side="left")
+        last = np.searchsorted(self.bin_starts, end, side="right") - 1
+
+        mask = np.zeros(self.n_rows, dtype=bool)
+        if first >= last:
+            mask[self.order[start:end]] = True
+            return _pack(mask)
+
+        mask[self.order[start:self.bin_starts[first]]] = True
+        mask[self.order[self.bin_starts[last]:end]] = True
+        return _pack(mask) | np.bitwise_or.reduce(self.bitmaps[first:last])
+
+    def to_axis(self, values):
+        return pd.to_datetime(values) if self.is_datetime else values
+
+    def from_axis(self, value):
+        # Date axes report positions as text such as "2024-01-03 12:00:00.5"
+        return float(pd.Timestamp(value).value) if self.is_datetime else float(value)
+
+    def aggregate(self, mask=None):
+        counts = np.array([_count(bitmap, mask) for bitmap in self.bitmaps], dtype=np.int64)
+        return pd.DataFrame({
+            "low": self.edges[:-1],
+            "high": self.edges[1:],
+            "count": counts
+        })
+
+
+# -----------------------------
+# Cross-filter
+# -----------------------------
+class CrossfilterIndex:
+    """Per-column indexes over one dataset; selections combine as bitmap ANDs.
+
+    A selection is (low, high) for numeric and datetime columns (in index
+    units, see NumericIndex) and a tuple of labels for categorical ones.
+    Each chart is filtered by every selection but its own.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns):
+        self.n_rows = len(df)
+        self.indexes = {}
+        for col in columns:
+            series = df[col]
+            if pd.api.types.is_datetime64_any_dtype(series) or (
+                pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+            ):
+                self.indexes[col] = NumericIndex(series)
+            else:
+                self.indexes[col] = CategoryIndex(df[col])
+
+        self._bitmaps = LRUCache(max_entries=32)
+        self._full = {col: index.aggregate() for col, index in self.indexes.items()}
+
+    def selection_bitmap(self, col, selection):
+        key = (col, selection)
+        bitmap = self._bitmaps.get(key)
+        if bitmap is None:
+            index = self.indexes[col]
+            if index.kind == "numeric":
+                bitmap = index.select(*selection)
+            else:
+                bitmap = index.select(selection)
+            self._bitmaps.put(key, bitmap)
+        return bitmap
+
+    def mask(self, selections: dict, exclude=None):
+        """Packed AND of every selection but `exclude`'s, or None if there are none."""
+        bitmaps = [
+            self.selection_bitmap(col, selection)
+            for col, selection in selections.items()
+            if col != exclude and selection
+        ]
+        if not bitmaps:
+            return None
+
+        combined = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            combined = combined & bitmap
+        return combined
+
+    def aggregate(self, col, selections: dict):
+        mask = self.mask(selections, exclude=col)
+        if mask is None:
+            return self._full[col]
+        return self.indexes[col].aggregate(mask)
+
+    def count(self, selections: dict):
+        mask = self.mask(selections)
+        return self.n_rows if mask is None else _count(mask)
+
+
+# -----------------------------
+# Dashboard
+# -----------------------------
+def _read_selection(index, state):
+    selection = (state or {}).get("selection", {})
+    if index.kind == "numeric":
+        boxes = selection.get("box", [])
+        if boxes:
+            low, high = sorted(index.from_axis(value) for value in boxes[0]["x"])
+            return (low, high)
+    else:
+        labels = tuple(sorted({str(point["x"]) for point in selection.get("points", [])}))
+        if labels:
+            return labels
+    return None
+
+
+def _chart(index, data, col, selection=None):
+    import plotly.graph_objects as go
+
+    if index.kind == "numeric":
+        width = data["high"] - data["low"]
+        fig = go.Figure(go.Bar(
+            x=index.to_axis((data["low"] + data["high"]) / 2),
+            y=data["count"],
+            # bar widths on a date axis are in milliseconds
+            width=width / 1e6 if index.is_datetime else width
+        ))
+        fig.update_layout(dragmode="select", bargap=0.05)
+        if selection:
+            low, high = index.to_axis(list(selection))
+            fig.add_vrect(x0=low, x1=high, fillcolor="royalblue", opacity=0.15,
+                          line_width=0, layer="below")
+    else:
+        selected = [i for i, label in enumerate(data["label"]) if label in (selection or ())]
+        fig = go.Figure(go.Bar(
+            x=data["label"],
+            y=data["count"],
+            selectedpoints=selected if selection else None
+        ))
+        fig.update_layout(clickmode="event+select")
+
+    fig.update_layout(title=col, height=300, margin={"t": 40, "b": 20, "l": 20, "r": 20})
+    return fig
+
+
+def _on_select(index, col, chart_key, selections_key):
+    # An empty event means the chart's own selection was cleared
+    selection = _read_selection(index, st.session_state.get(chart_key))
+    if selection is None:
+        st.session_state[selections_key].pop(col, None)
+    else:
+        st.session_state[selections_key][col] = selection
+
+
+def render_dashboard(xf: CrossfilterIndex, key="crossfilter", n_cols=2):
+    """Linked charts: brush a histogram or click bars to filter the others.
+
+    Selections live in session state, updated from each chart's on_select
+    callback. A chart's figure changes whenever another chart is filtered,
+    which remounts it and drops its brush, so the active range or bars are
+    drawn into the figure instead.
+    """
+    selections_key = f"{key}_selections"
+    generation_key = f"{key}_generation"
+    index_key = f"{key}_index"
+    if st.session_state.get(index_key) is not xf:
+        st.session_state[index_key] = xf
+        st.session_state[selections_key] = {}
+    if generation_key not in st.session_state:
+        st.session_state[generation_key] = 0
+
+    if st.button("Clear selections", key=f"{key}_clear"):
+        st.session_state[selections_key] = {}
+        st.session_state[generation_key] += 1
+    generation = st.session_state[generation_key]
+
+    chart_keys = {col: f"{key}_{generation}_{col}" for col in xf.indexes}
+    selections = dict(st.session_state[selections_key])
+
+    start = time.perf_counter()
+    aggregates = {col: xf.aggregate(col, selections) for col in xf.indexes}
+    selected = xf.count(selections)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    st.caption(
+        f"{selected:,} of {xf.n_rows:,} rows selected · updated in {elapsed_ms:.0f} ms"
+    )
+
+    cols = st.columns(n_cols)
+    for i, (col, index) in enumerate(xf.indexes.items()):
+        with cols[i % n_cols]:
+            st.plotly_chart(
+                _chart(index, aggregates[col], col, selections.get(col)),
+                use_container_width=True,
+                on_select=functools.partial(
+                    _on_select, index, col, chart_keys[col], selections_key
+                ),
+                selection_mode="box" if index.kind == "numeric" else "points",
+                key=chart_keys[col]
+            )
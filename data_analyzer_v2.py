@@ -1,7 +1,12 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import numpy as np
+
+from cache_utils import LRUCache
+from crossfilter import CrossfilterIndex, render_dashboard
+from engines import available_engines, make_engine
+from figures import cached_figure
+from startup import duckdb_connection, warm_up
+from timeseries import is_timeseries, render_timeseries_chart
 
 # --------------------------------------------------
 # App config
@@ -21,8 +26,20 @@ st.caption("Modern interactive data exploration tool")
 if "df" not in st.session_state:
     st.session_state.df = None
 
-if "filtered_df" not in st.session_state:
-    st.session_state.filtered_df = None
+# identifies the loaded dataset, used in the figure cache key
+if "data_version" not in st.session_state:
+    st.session_state.data_version = None
+
+# one engine per backend for the current dataset
+if "engines" not in st.session_state:
+    st.session_state.engines = {}
+
+if "figure_cache" not in st.session_state:
+    st.session_state.figure_cache = LRUCache(max_entries=32)
+
+# bitmap / sorted indexes for the dashboard, per dataset and column set
+if "crossfilter" not in st.session_state:
+    st.session_state.crossfilter = LRUCache(max_entries=2)
 
 # --------------------------------------------------
 # Data loading
@@ -47,10 +64,22 @@ uploaded_file = st.sidebar.file_uploader(
     type=["csv", "xlsx"]
 )
 
+engine_name = st.sidebar.selectbox(
+    "Engine",
+    available_engines(),
+    help="Backend used for overview, filters, stats and chart data"
+)
+
+warm_up()
+
 if uploaded_file:
     df = load_data(uploaded_file)
     st.session_state.df = df
-    st.session_state.filtered_df = df.copy()
+
+    data_version = (uploaded_file.name, uploaded_file.size)
+    if data_version != st.session_state.data_version:
+        st.session_state.data_version = data_version
+        st.session_state.engines = {}
 
 # --------------------------------------------------
 # Guard clause
@@ -60,36 +89,38 @@ if st.session_state.df is None:
     st.stop()
 
 df = st.session_state.df
-filtered_df = st.session_state.filtered_df
+figure_cache = st.session_state.figure_cache
+
+if engine_name not in st.session_state.engines:
+    st.session_state.engines[engine_name] = make_engine(
+        engine_name, df, con=duckdb_connection()
+    )
+engine = st.session_state.engines[engine_name]
 
 # --------------------------------------------------
 # Tabs
 # --------------------------------------------------
-tab_overview, tab_filter, tab_viz, tab_stats = st.tabs(
-    ["📋 Overview", "🔍 Filter", "📈 Visualize", "🧪 Stats"]
+tab_overview, tab_filter, tab_viz, tab_stats, tab_dashboard = st.tabs(
+    ["📋 Overview", "🔍 Filter", "📈 Visualize", "🧪 Stats", "🔗 Dashboard"]
 )
 
 # ==================================================
 # 📋 OVERVIEW
 # ==================================================
 with tab_overview:
+    summary = engine.column_summary()
+
     col1, col2, col3 = st.columns(3)
-    col1.metric("Rows", len(df))
-    col2.metric("Columns", df.shape[1])
-    col3.metric("Missing values", int(df.isna().sum().sum()))
+    col1.metric("Rows", engine.row_count())
+    col2.metric("Columns", len(summary))
+    col3.metric("Missing values", int(engine.missing_counts().sum()))
 
     st.subheader("Column Summary")
 
-    summary = pd.DataFrame({
-        "dtype": df.dtypes.astype(str),
-        "missing %": (df.isna().mean() * 100).round(2),
-        "unique values": df.nunique()
-    })
-
     st.dataframe(summary, use_container_width=True)
 
     with st.expander("Preview data"):
-        st.dataframe(df.head(100), use_container_width=True)
+        st.dataframe(engine.to_pandas(limit=100), use_container_width=True)
 
 # ==================================================
 # 🔍 FILTER
@@ -97,34 +128,31 @@ with tab_overview:
 with tab_filter:
     st.subheader("Filter dataset")
 
-    temp_df = df.copy()
+    filters = []
 
-    for col in df.columns:
-        if pd.api.types.is_numeric_dtype(df[col]):
-            min_val, max_val = st.slider(
-                f"{col}",
-                float(df[col].min()),
-                float(df[col].max()),
-                (float(df[col].min()), float(df[col].max()))
-            )
-            temp_df = temp_df[temp_df[col].between(min_val, max_val)]
+    for col, (kind, *options) in engine.filter_options().items():
+        if kind == "range":
+            low, high = float(options[0]), float(options[1])
+            min_val, max_val = st.slider(f"{col}", low, high, (low, high))
+            filters.append(("range", col, min_val, max_val))
 
         else:
             values = st.multiselect(
                 f"{col}",
-                options=df[col].dropna().unique(),
-                default=df[col].dropna().unique()
+                options=options[0],
+                default=options[0]
             )
-            temp_df = temp_df[temp_df[col].isin(values)]
+            filters.append(("isin", col, tuple(values)))
 
-    st.session_state.filtered_df = temp_df
+    filtered = engine.filter(filters)
+    figure_version = (st.session_state.data_version, engine_name, tuple(filters))
 
-    st.success(f"Filtered rows: {len(temp_df)}")
-    st.dataframe(temp_df.head(100), use_container_width=True)
+    st.success(f"Filtered rows: {filtered.row_count()}")
+    st.dataframe(filtered.to_pandas(limit=100), use_container_width=True)
 
     st.download_button(
         "⬇ Download filtered data",
-        temp_df.to_csv(index=False),
+        filtered.to_pandas().to_csv(index=False),
         file_name="filtered_data.csv"
     )
 
@@ -139,33 +167,46 @@ with tab_viz:
         ["Scatter", "Line", "Bar", "Box", "Histogram"]
     )
 
-    x_col = st.selectbox("X-axis", filtered_df.columns)
+    x_col = st.selectbox("X-axis", engine.columns())
     y_col = None
 
     if chart_type != "Histogram":
-        y_col = st.selectbox("Y-axis", filtered_df.columns)
+        y_col = st.selectbox("Y-axis", engine.columns())
 
     color_col = st.selectbox(
         "Color (optional)",
-        [None] + list(filtered_df.columns)
+        [None] + engine.columns()
     )
 
-    if chart_type == "Scatter":
-        fig = px.scatter(filtered_df, x=x_col, y=y_col, color=color_col)
-
-    elif chart_type == "Line":
-        fig = px.line(filtered_df, x=x_col, y=y_col, color=color_col)
-
-    elif chart_type == "Bar":
-        fig = px.bar(filtered_df, x=x_col, y=y_col, color=color_col)
-
-    elif chart_type == "Box":
-        fig = px.box(filtered_df, x=x_col, y=y_col, color=color_col)
-
+    # chart preparation: only the plotted columns leave the engine
+    chart_cols = list(dict.fromkeys(c for c in (x_col, y_col, color_col) if c is not None))
+
+    if chart_type == "Line" and is_timeseries(filtered.to_pandas(chart_cols, limit=20), x_col, y_col):
+        con = duckdb_connection()
+
+        render_timeseries_chart(
+            con,
+            "data",
+            x_col,
+            y_col,
+            color=color_col,
+            version=figure_version,
+            cache=figure_cache,
+            # only collected from the engine when the chart is not cached
+            register=lambda: con.register("data", filtered.to_pandas(chart_cols))
+        )
     else:
-        fig = px.histogram(filtered_df, x=x_col, color=color_col)
+        fig = cached_figure(
+            figure_cache,
+            figure_version,
+            lambda: filtered.to_pandas(chart_cols),
+            chart_type,
+            x=x_col,
+            y=y_col,
+            color=color_col
+        )
 
-    st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True)
 
 # ==================================================
 # 🧪 STATS
@@ -174,14 +215,38 @@ with tab_stats:
     st.subheader("Statistical analysis")
 
     st.markdown("### Describe dataset")
-    st.dataframe(filtered_df.describe(include="all").transpose())
+    st.dataframe(filtered.describe())
 
     st.markdown("### Correlation matrix")
-    numeric_cols = filtered_df.select_dtypes(include=np.number)
 
-    if len(numeric_cols.columns) > 1:
-        corr = numeric_cols.corr()
-        fig = px.imshow(corr, text_auto=True)
+    if len(filtered.numeric_columns()) > 1:
+        fig = cached_figure(figure_cache, figure_version, filtered.corr, "Heatmap")
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("Not enough numeric columns for correlation")
+
+# ==================================================
+# 🔗 DASHBOARD
+# ==================================================
+with tab_dashboard:
+    st.subheader("Linked charts")
+    st.caption("Brush a histogram or click bars to filter every other chart")
+
+    dashboard_cols = st.multiselect(
+        "Columns",
+        list(df.columns),
+        default=list(df.columns[:4])
+    )
+
+    if dashboard_cols:
+        # Indexes are built once per dataset and column set
+        xf_key = (st.session_state.data_version, tuple(dashboard_cols))
+        xf = st.session_state.crossfilter.get(xf_key)
+        if xf is None:
+            with st.spinner("Indexing columns..."):
+                xf = CrossfilterIndex(df, dashboard_cols)
+            st.session_state.crossfilter.put(xf_key, xf)
+
+        render_dashboard(xf)
+    else:
+        st.info("Pick columns to chart")
@@ -1,7 +1,16 @@
 import streamlit as st
 import pandas as pd
-import duckdb
-import plotly.express as px
+
+from cache_utils import LRUCache
+from figures import cached_figure
+from startup import duckdb_connection, warm_up
+from sql_templates import (
+    BUILTIN_TEMPLATES,
+    PARAM_TYPES,
+    cached_execute,
+    find_params,
+    guess_param_type
+)
 
 # -----------------------------
 # Page config
@@ -17,25 +26,48 @@ st.caption("Upload data, query with SQL, and visualize results")
 # -----------------------------
 # Session state initialization
 # -----------------------------
-if "duckdb_con" not in st.session_state:
-    st.session_state.duckdb_con = duckdb.connect(database=":memory:")
-
 if "df" not in st.session_state:
     st.session_state.df = None
 
 if "sql_result" not in st.session_state:
     st.session_state.sql_result = None
 
+# changes whenever sql_result holds different data
+if "sql_result_version" not in st.session_state:
+    st.session_state.sql_result_version = None
+
+if "query_runs" not in st.session_state:
+    st.session_state.query_runs = 0
+
 if "sql_query" not in st.session_state:
     st.session_state.sql_query = "SELECT * FROM data LIMIT 100"
 
+if "data_version" not in st.session_state:
+    st.session_state.data_version = None
+
+if "saved_templates" not in st.session_state:
+    st.session_state.saved_templates = dict(BUILTIN_TEMPLATES)
+
+if "prepared_statements" not in st.session_state:
+    st.session_state.prepared_statements = {}
+
+if "template_cache" not in st.session_state:
+    st.session_state.template_cache = LRUCache(max_entries=64)
+
+# template + parameter set that last produced sql_result
+if "last_template_run" not in st.session_state:
+    st.session_state.last_template_run = None
+
+if "figure_cache" not in st.session_state:
+    st.session_state.figure_cache = LRUCache(max_entries=32)
+
 # -----------------------------
 # Helper functions
 # -----------------------------
 
 
 def register_dataframe(df: pd.DataFrame):
-    con = st.session_state.duckdb_con
+    con = duckdb_connection("duckdb_con")
 
     # Safely unregister if it already exists
     try:
@@ -74,7 +106,9 @@ uploaded_file = st.sidebar.file_uploader(
     type=["csv", "xlsx"]
 )
 
-if uploaded_file:
+warm_up()
+
+if uploaded_file and (uploaded_file.name, uploaded_file.size) != st.session_state.data_version:
     try:
         if uploaded_file.name.endswith(".csv"):
             df = pd.read_csv(uploaded_file)
@@ -84,6 +118,11 @@ if uploaded_file:
         st.session_state.df = df
         register_dataframe(df)
 
+        # New data: prepared plans and cached template results are stale
+        st.session_state.data_version = (uploaded_file.name, uploaded_file.size)
+        st.session_state.prepared_statements = {}
+        st.session_state.template_cache.clear()
+
         st.sidebar.success(
             f"Loaded {df.shape[0]} rows × {df.shape[1]} columns")
 
@@ -146,12 +185,33 @@ ORDER BY total DESC
 
         run_query = st.button("▶ Run Query")
 
+        with st.expander("💾 Save as template"):
+            new_template_name = st.text_input("Template name")
+
+            param_types = {}
+            for name in find_params(sql_query):
+                param_types[name] = st.selectbox(
+                    f"Type of :{name}",
+                    PARAM_TYPES,
+                    index=PARAM_TYPES.index(guess_param_type(name)),
+                    key=f"param_type_{name}"
+                )
+
+            if st.button("Save Template") and new_template_name:
+                st.session_state.saved_templates[new_template_name] = {
+                    "sql": sql_query,
+                    "params": param_types
+                }
+                st.success(f"Saved template '{new_template_name}'")
+
     if run_query:
         try:
-            con = st.session_state.duckdb_con
+            con = duckdb_connection("duckdb_con")
             result = con.execute(sql_query).df()
 
             st.session_state.sql_result = result
+            st.session_state.query_runs += 1
+            st.session_state.sql_result_version = ("query", st.session_state.query_runs)
             st.session_state.sql_query = sql_query
 
             st.success(f"Query executed successfully – {len(result)} rows")
@@ -160,6 +220,59 @@ ORDER BY total DESC
             st.session_state.sql_result = None
             st.error(f"SQL Error: {e}")
 
+    st.markdown("### Saved Templates")
+    st.caption("Use `:name` placeholders; results are cached per parameter set")
+
+    template_name = st.selectbox(
+        "Template",
+        [None] + list(st.session_state.saved_templates)
+    )
+
+    if template_name is not None:
+        template = st.session_state.saved_templates[template_name]
+        st.code(template["sql"], language="sql")
+
+        values = {}
+        param_cols = st.columns(max(len(template["params"]), 1))
+        for col, (name, param_type) in zip(param_cols, template["params"].items()):
+            key = f"tpl_{template_name}_{name}"
+            with col:
+                if param_type == "int":
+                    values[name] = st.number_input(name, value=100, step=1, key=key)
+                elif param_type == "float":
+                    values[name] = st.number_input(name, value=0.0, key=key)
+                elif param_type == "date":
+                    values[name] = st.date_input(name, key=key)
+                else:
+                    values[name] = st.text_input(name, key=key)
+
+        template_run = (
+            st.session_state.data_version,
+            template_name,
+            template["sql"],
+            tuple(str(value) for value in values.values())
+        )
+
+        # A manual run wins; the template only runs again once the
+        # selection or its parameters change
+        if run_query:
+            st.session_state.last_template_run = template_run
+        elif template_run != st.session_state.last_template_run:
+            st.session_state.last_template_run = template_run
+            try:
+                st.session_state.sql_result = cached_execute(
+                    duckdb_connection("duckdb_con"),
+                    st.session_state.prepared_statements,
+                    st.session_state.template_cache,
+                    st.session_state.data_version,
+                    template,
+                    values
+                )
+                st.session_state.sql_result_version = ("template",) + template_run
+            except Exception as e:
+                st.session_state.sql_result = None
+                st.error(f"SQL Error: {e}")
+
     if st.session_state.sql_result is not None:
         st.markdown("### Result Preview")
 
@@ -194,12 +307,14 @@ with viz_tab:
             chart_type, x, y = suggestions[0]
             st.caption(f"Suggested chart: {chart_type}")
 
-            if chart_type == "Scatter":
-                fig = px.scatter(df_plot, x=x, y=y)
-            elif chart_type == "Bar":
-                fig = px.bar(df_plot, x=x, y=y)
-            elif chart_type == "Histogram":
-                fig = px.histogram(df_plot, x=x)
+            fig = cached_figure(
+                st.session_state.figure_cache,
+                st.session_state.sql_result_version,
+                df_plot,
+                chart_type,
+                x=x,
+                y=y
+            )
 
             st.plotly_chart(fig, use_container_width=True)
 
@@ -1,9 +1,14 @@
 import streamlit as st
 import pandas as pd
-import duckdb
-import plotly.express as px
+import json
 from datetime import datetime
 
+from cache_utils import LRUCache
+from engines import DuckDBEngine
+from figures import cached_figure
+from startup import duckdb_connection, warm_up
+from timeseries import is_timeseries, render_timeseries_chart
+
 # -------------------------
 # App Config
 # -------------------------
@@ -22,15 +27,18 @@ MAX_VIZ_ROWS = 50_000
 if "df" not in st.session_state:
     st.session_state.df = None
 
-if "con" not in st.session_state:
-    st.session_state.con = duckdb.connect(database=":memory:")
-
 if "query_history" not in st.session_state:
     st.session_state.query_history = []
 
 if "last_query_result" not in st.session_state:
     st.session_state.last_query_result = None
 
+if "data_version" not in st.session_state:
+    st.session_state.data_version = None
+
+if "figure_cache" not in st.session_state:
+    st.session_state.figure_cache = LRUCache(max_entries=32)
+
 
 # -------------------------
 # Sidebar – File Upload
@@ -42,7 +50,9 @@ uploaded_file = st.sidebar.file_uploader(
     type=["csv", "xlsx"]
 )
 
-if uploaded_file:
+warm_up()
+
+if uploaded_file and (uploaded_file.name, uploaded_file.size) != st.session_state.data_version:
     try:
         if uploaded_file.name.endswith(".csv"):
             df = pd.read_csv(uploaded_file)
@@ -51,10 +61,13 @@ if uploaded_file:
 
         st.session_state.df = df
 
-        con = st.session_state.con
+        con = duckdb_connection()
         con.execute("DROP TABLE IF EXISTS data")
         con.register("data", df)
 
+        st.session_state.data_version = (uploaded_file.name, uploaded_file.size)
+        st.session_state.figure_cache.clear()
+
         st.sidebar.success("Dataset loaded successfully")
 
     except Exception as e:
@@ -95,15 +108,18 @@ with tabs[0]:
         st.subheader("Dataset Preview")
         st.dataframe(df.head(100))
 
+        # Profile the registered table, so types match what SQL Lab sees
+        engine = DuckDBEngine.from_table(duckdb_connection(), "data")
+
         col1, col2 = st.columns(2)
 
         with col1:
             st.subheader("Column Types")
-            st.dataframe(df.dtypes.astype(str))
+            st.dataframe(pd.Series(engine.dtypes(), name="type"))
 
         with col2:
             st.subheader("Missing Values")
-            st.dataframe(df.isnull().sum())
+            st.dataframe(engine.missing_counts().rename("missing"))
 
 
 # ======================================================
@@ -138,20 +154,29 @@ with tabs[1]:
         if chart_type in ["Scatter", "Line", "Bar", "Box"]:
             y_col = st.selectbox("Y axis", filtered_df.columns)
 
-        if len(filtered_df) > MAX_VIZ_ROWS:
+        if chart_type == "Line" and is_timeseries(filtered_df, x_col, y_col):
+            # Resampled in DuckDB, so the row cap does not apply
+            render_timeseries_chart(
+                duckdb_connection(),
+                "data",
+                x_col,
+                y_col,
+                version=("raw", st.session_state.data_version),
+                cache=st.session_state.figure_cache,
+                key="raw_timeseries"
+            )
+        elif len(filtered_df) > MAX_VIZ_ROWS:
             st.warning(
                 "Too many rows for visualization. Apply filters or use SQL.")
         else:
-            if chart_type == "Histogram":
-                fig = px.histogram(filtered_df, x=x_col)
-            elif chart_type == "Bar":
-                fig = px.bar(filtered_df, x=x_col, y=y_col)
-            elif chart_type == "Box":
-                fig = px.box(filtered_df, x=x_col, y=y_col)
-            elif chart_type == "Scatter":
-                fig = px.scatter(filtered_df, x=x_col, y=y_col)
-            else:
-                fig = px.line(filtered_df, x=x_col, y=y_col)
+            fig = cached_figure(
+                st.session_state.figure_cache,
+                ("raw", st.session_state.data_version),
+                filtered_df,
+                chart_type,
+                x=x_col,
+                y=y_col
+            )
 
             st.plotly_chart(fig, use_container_width=True)
 
@@ -173,7 +198,7 @@ with tabs[2]:
 
         if st.button("▶ Run Query"):
             try:
-                result_df = st.session_state.con.execute(query).fetchdf()
+                result_df = duckdb_connection().execute(query).fetchdf()
 
                 if len(result_df) > MAX_VIZ_ROWS:
                     st.warning("Query result too large. Limited to 50k rows.")
@@ -201,6 +226,18 @@ with tabs[2]:
                     f"**{i}. [{q['timestamp']}] Rows: {q['rows']}**\n\n```sql\n{q['query']}\n```"
                 )
 
+            # Notebook for batch_runner.py (runs the queries headless over many files)
+            notebook = [
+                {"name": f"query_{i}", "timestamp": q["timestamp"], "query": q["query"]}
+                for i, q in enumerate(st.session_state.query_history, 1)
+            ]
+            st.download_button(
+                "⬇ Save history as notebook",
+                json.dumps(notebook, indent=2),
+                file_name="sql_notebook.json",
+                mime="application/json"
+            )
+
 
 # ======================================================
 # TAB 4 — QUERY VISUALIZATION
@@ -227,14 +264,15 @@ with tabs[3]:
         if len(result_df) > MAX_VIZ_ROWS:
             st.warning("Result too large to visualize.")
         else:
-            if chart_type == "Histogram":
-                fig = px.histogram(result_df, x=x_col)
-            elif chart_type == "Bar":
-                fig = px.bar(result_df, x=x_col, y=y_col)
-            elif chart_type == "Line":
-                fig = px.line(result_df, x=x_col, y=y_col)
-            else:
-                fig = px.scatter(result_df, x=x_col, y=y_col)
+            # each run appends to the history, so its length versions the result
+            fig = cached_figure(
+                st.session_state.figure_cache,
+                ("query", len(st.session_state.query_history)),
+                result_df,
+                chart_type,
+                x=x_col,
+                y=y_col
+            )
 
             st.plotly_chart(fig, use_container_width=True)
 
@@ -0,0 +1,432 @@
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+from sql_utils import quote_ident
+
+# -----------------------------
+# Engine selection
+# -----------------------------
+# Rows of Engine.describe(), shared by every backend
+DESCRIBE_STATS = ["count", "unique", "mean", "std", "min", "25%", "50%", "75%", "max"]
+QUANTILES = {"25%": 0.25, "50%": 0.5, "75%": 0.75}
+
+SQL_NUMERIC_TYPES = (
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+    "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT",
+    "FLOAT", "DOUBLE", "REAL", "DECIMAL"
+)
+
+
+def available_engines():
+    engines = ["pandas", "DuckDB"]
+    if importlib.util.find_spec("polars") is not None:
+        engines.insert(0, "Polars")
+    return engines
+
+
+def make_engine(name: str, df: pd.DataFrame, con=None):
+    """Wrap a loaded DataFrame in the named backend.
+
+    Filters are passed as tuples: ("range", col, low, high) keeps
+    low <= col <= high and ("isin", col, values) keeps rows whose value
+    is in `values`. Missing values never match either filter.
+    """
+    if name == "Polars":
+        return PolarsEngine.from_pandas(df)
+    if name == "DuckDB":
+        return DuckDBEngine.from_pandas(con, df)
+    return PandasEngine(df)
+
+
+def _py(value):
+    # numpy scalars -> python scalars for DuckDB parameters
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _arrow_compatible(df: pd.DataFrame):
+    """Cast object columns that mix types (e.g. [1, "x"]) to text, as DuckDB does.
+
+    Arrow needs one type per column; such columns come from mixed Excel cells
+    or chunked read_csv type inference.
+    """
+    mixed = [
+        col for col in df.columns
+        if df[col].dtype == object
+        and pd.api.types.infer_dtype(df[col], skipna=True) in ("mixed", "mixed-integer")
+    ]
+    if not mixed:
+        return df
+
+    df = df.copy()
+    for col in mixed:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+# -----------------------------
+# Base engine
+# -----------------------------
+class Engine:
+    name = None
+
+    def __init__(self):
+        self._filter_options = None
+
+    def column_summary(self):
+        rows = max(self.row_count(), 1)
+        return pd.DataFrame({
+            "dtype": pd.Series(self.dtypes()),
+            "missing %": (self.missing_counts() / rows * 100).round(2),
+            "unique values": self.unique_counts()
+        })
+
+    def filter_options(self):
+        """Slider bounds for numeric columns and choices for the others."""
+        if self._filter_options is None:
+            numeric = set(self.numeric_columns())
+            self._filter_options = {
+                col: ("range", *self.min_max(col)) if col in numeric
+                else ("isin", self.distinct(col))
+                for col in self.columns()
+            }
+        return self._filter_options
+
+    def _describe_frame(self, stats: dict):
+        return pd.DataFrame.from_dict(stats, orient="index", columns=DESCRIBE_STATS)
+
+
+# -----------------------------
+# pandas (eager)
+# -----------------------------
+class PandasEngine(Engine):
+    name = "pandas"
+
+    def __init__(self, df: pd.DataFrame):
+        super().__init__()
+        self.df = df
+
+    def filter(self, filters):
+        mask = pd.Series(True, index=self.df.index)
+        for kind, col, *args in filters:
+            if kind == "range":
+                mask &= self.df[col].between(*args)
+            else:
+                mask &= self.df[col].isin(args[0])
+        return PandasEngine(self.df[mask])
+
+    def columns(self):
+        return list(self.df.columns)
+
+    def numeric_columns(self):
+        return list(self.df.select_dtypes(include=np.number).columns)
+
+    def dtypes(self):
+        return self.df.dtypes.astype(str).to_dict()
+
+    def row_count(self):
+        return len(self.df)
+
+    def missing_counts(self):
+        return self.df.isna().sum()
+
+    def unique_counts(self):
+        return self.df.nunique()
+
+    def min_max(self, col):
+        return self.df[col].min(), self.df[col].max()
+
+    def distinct(self, col):
+        return list(self.df[col].dropna().unique())
+
+    def describe(self):
+        numeric = set(self.numeric_columns())
+        stats = {}
+        for col in self.df.columns:
+            series = self.df[col]
+            row = {"count": series.count()}
+            if col in numeric:
+                row.update({
+                    "mean": series.mean(),
+                    "std": series.std(),
+                    "min": series.min(),
+                    "max": series.max()
+                })
+                row.update({label: series.quantile(q) for label, q in QUANTILES.items()})
+            else:
+                row["unique"] = series.nunique()
+            stats[col] = row
+        return self._describe_frame(stats)
+
+    def corr(self):
+        return self.df[self.numeric_columns()].corr()
+
+    def to_pandas(self, columns=None, limit=None):
+        df = self.df if columns is None else self.df[columns]
+        return df if limit is None else df.head(limit)
+
+
+# -----------------------------
+# DuckDB (SQL over the registered frame)
+# -----------------------------
+class DuckDBEngine(Engine):
+    name = "DuckDB"
+
+    def __init__(self, con, source: str, params=(), schema=None):
+        super().__init__()
+        self.con = con
+        self.source = source
+        self.params = list(params)
+        self.schema = schema
+
+    @classmethod
+    def from_table(cls, con, table: str):
+        source = f"SELECT * FROM {quote_ident(table)}"
+        schema = {
+            col: sql_type
+            for col, sql_type, *_ in con.execute(f"DESCRIBE {source}").fetchall()
+        }
+        return cls(con, source, schema=schema)
+
+    @classmethod
+    def from_pandas(cls, con, df: pd.DataFrame, table=None):
+        # One view per frame: engines for other datasets may share `con`, and
+        # the registration keeps `df` alive, so its id is not reused meanwhile
+        table = table or f"engine_data_{id(df)}"
+        con.register(table, df)
+        return cls.from_table(con, table)
+
+    def _select(self, select_sql, extra_sql="", extra_params=()):
+        return self.con.execute(
+            f"SELECT {select_sql} FROM ({self.source}) AS src {extra_sql}",
+            self.params + list(extra_params)
+        )
+
+    def _row(self, exprs: dict):
+        # One aggregate query; exprs maps result key -> SQL expression
+        aliases = [f"c{i}" for i in range(len(exprs))]
+        select_sql = ", ".join(f"{sql} AS {alias}" for sql, alias in zip(exprs.values(), aliases))
+        return dict(zip(exprs, self._select(select_sql).fetchone()))
+
+    def filter(self, filters):
+        clauses, params = [], []
+        for kind, col, *args in filters:
+            if kind == "range":
+                clauses.append(f"{quote_ident(col)} BETWEEN ? AND ?")
+                params += [_py(value) for value in args]
+            elif args[0]:
+                placeholders = ", ".join("?" * len(args[0]))
+                clauses.append(f"{quote_ident(col)} IN ({placeholders})")
+                params += [_py(value) for value in args[0]]
+            else:
+                clauses.append("FALSE")
+
+        if not clauses:
+            return self
+        source = f"SELECT * FROM ({self.source}) AS src WHERE {' AND '.join(clauses)}"
+        return DuckDBEngine(self.con, source, self.params + params, self.schema)
+
+    def columns(self):
+        return list(self.schema)
+
+    def numeric_columns(self):
+        return [col for col, sql_type in self.schema.items()
+                if sql_type.startswith(SQL_NUMERIC_TYPES)]
+
+    def dtypes(self):
+        return dict(self.schema)
+
+    def row_count(self):
+        return self._select("COUNT(*)").fetchone()[0]
+
+    def missing_counts(self):
+        return pd.Series(self._row({
+            col: f"COUNT(*) - COUNT({quote_ident(col)})" for col in self.columns()
+        }))
+
+    def unique_counts(self):
+        return pd.Series(self._row({
+            col: f"COUNT(DISTINCT {quote_ident(col)})" for col in self.columns()
+        }))
+
+    def min_max(self, col):
+        return self._select(f"MIN({quote_ident(col)}), MAX({quote_ident(col)})").fetchone()
+
+    def distinct(self, col):
+        q = quote_ident(col)
+        return [row[0] for row in self._select(f"DISTINCT {q}", f"WHERE {q} IS NOT NULL").fetchall()]
+
+    def describe(self):
+        numeric = set(self.numeric_columns())
+        exprs = {}
+        for col in self.columns():
+            q = quote_ident(col)
+            exprs[(col, "count")] = f"COUNT({q})"
+            if col in numeric:
+                exprs[(col, "mean")] = f"AVG({q})"
+                exprs[(col, "std")] = f"STDDEV_SAMP({q})"
+                exprs[(col, "min")] = f"MIN({q})"
+                exprs[(col, "max")] = f"MAX({q})"
+                for label, q_value in QUANTILES.items():
+                    exprs[(col, label)] = f"QUANTILE_CONT({q}, {q_value})"
+            else:
+                exprs[(col, "unique")] = f"COUNT(DISTINCT {q})"
+
+        stats = {col: {} for col in self.columns()}
+        for (col, stat), value in self._row(exprs).items():
+            stats[col][stat] = value
+        return self._describe_frame(stats)
+
+    def corr(self):
+        numeric = self.numeric_columns()
+        pairs = {
+            (a, b): f"CORR({quote_ident(a)}, {quote_ident(b)})"
+            for i, a in enumerate(numeric) for b in numeric[i:]
+        }
+        values = self._row(pairs) if pairs else {}
+
+        matrix = pd.DataFrame(np.nan, index=numeric, columns=numeric)
+        for (a, b), value in values.items():
+            matrix.loc[a, b] = matrix.loc[b, a] = value
+        return matrix
+
+    def to_pandas(self, columns=None, limit=None):
+        select_sql = "*" if columns is None else ", ".join(quote_ident(col) for col in columns)
+        limit_sql = "" if limit is None else f"LIMIT {int(limit)}"
+        return self._select(select_sql, limit_sql).df()
+
+
+# -----------------------------
+# Polars (lazy, multi-threaded)
+# -----------------------------
+class PolarsEngine(Engine):
+    name = "Polars"
+
+    def __init__(self, lf):
+        super().__init__()
+        self.lf = lf
+        self.schema = lf.collect_schema()
+
+    @classmethod
+    def from_pandas(cls, df: pd.DataFrame):
+        import polars as pl
+
+        return cls(pl.from_pandas(_arrow_compatible(df)).lazy())
+
+    def _row(self, exprs: list):
+        return self.lf.select(exprs).collect().row(0, named=True)
+
+    def filter(self, filters):
+        import polars as pl
+
+        predicates = []
+        for kind, col, *args in filters:
+            if kind == "range":
+                predicates.append(pl.col(col).is_between(*args))
+            elif args[0]:
+                predicates.append(pl.col(col).is_in(list(args[0])))
+            else:
+                predicates.append(pl.lit(False))
+
+        if not predicates:
+            return self
+        return PolarsEngine(self.lf.filter(pl.all_horizontal(predicates)))
+
+    def columns(self):
+        return self.schema.names()
+
+    def numeric_columns(self):
+        return [col for col, dtype in self.schema.items() if dtype.is_numeric()]
+
+    def dtypes(self):
+        return {col: str(dtype) for col, dtype in self.schema.items()}
+
+    def row_count(self):
+        import polars as pl
+
+        return self.lf.select(pl.len()).collect().item()
+
+    def missing_counts(self):
+        import polars as pl
+
+        return pd.Series(self._row([pl.all().null_count()]))
+
+    def unique_counts(self):
+        import polars as pl
+
+        return pd.Series(self._row([pl.all().drop_nulls().n_unique()]))
+
+    def min_max(self, col):
+        import polars as pl
+
+        row = self._row([pl.col(col).min().alias("min"), pl.col(col).max().alias("max")])
+        return row["min"], row["max"]
+
+    def distinct(self, col):
+        import polars as pl
+
+        return (
+            self.lf.select(pl.col(col).drop_nulls().unique(maintain_order=True))
+            .collect()
+            .to_series()
+            .to_list()
+        )
+
+    def describe(self):
+        import polars as pl
+
+        numeric = set(self.numeric_columns())
+        exprs, keys = [], []
+        for col in self.columns():
+            c = pl.col(col)
+            col_exprs = {"count": c.count()}
+            if col in numeric:
+                col_exprs.update({
+                    "mean": c.mean(),
+                    "std": c.std(),
+                    "min": c.min(),
+                    "max": c.max()
+                })
+                for label, q in QUANTILES.items():
+                    col_exprs[label] = c.quantile(q, interpolation="linear")
+            else:
+                col_exprs["unique"] = c.drop_nulls().n_unique()
+
+            for stat, expr in col_exprs.items():
+                exprs.append(expr.alias(f"c{len(keys)}"))
+                keys.append((col, stat))
+
+        row = self._row(exprs)
+        stats = {col: {} for col in self.columns()}
+        for i, (col, stat) in enumerate(keys):
+            stats[col][stat] = row[f"c{i}"]
+        return self._describe_frame(stats)
+
+    def corr(self):
+        import polars as pl
+
+        numeric = self.numeric_columns()
+        exprs, keys = [], []
+        for i, a in enumerate(numeric):
+            for b in numeric[i:]:
+                # pairwise-complete rows, as in pandas
+                both = pl.col(a).is_not_null() & pl.col(b).is_not_null()
+                exprs.append(
+                    pl.corr(pl.col(a).filter(both), pl.col(b).filter(both))
+                    .alias(f"c{len(keys)}")
+                )
+                keys.append((a, b))
+
+        matrix = pd.DataFrame(np.nan, index=numeric, columns=numeric)
+        if exprs:
+            row = self._row(exprs)
+            for i, (a, b) in enumerate(keys):
+                matrix.loc[a, b] = matrix.loc[b, a] = row[f"c{i}"]
+        return matrix
+
+    def to_pandas(self, columns=None, limit=None):
+        lf = self.lf if columns is None else self.lf.select(columns)
+        if limit is not None:
+            lf = lf.head(limit)
+        return lf.collect().to_pandas()
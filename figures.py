@@ -0,0 +1,117 @@
+import functools
+
+import numpy as np
+
+from cache_utils import LRUCache
+
+# -----------------------------
+# Chart builders
+# -----------------------------
+# plotly.express function names; plotly is imported on first build
+CHART_BUILDERS = {
+    "Scatter": "scatter",
+    "Line": "line",
+    "Bar": "bar",
+    "Box": "box",
+    "Histogram": "histogram"
+}
+
+# Floats are sent as f4 when rounding moves no point by more than this
+# fraction of the axis span (a few thousand pixels wide at most)
+F4_TOLERANCE = 1e-5
+
+
+def _compact_array(values):
+    """Smaller typed-array form of a trace array, or None to keep it as is."""
+    if values.dtype == np.float64:
+        finite = values[np.isfinite(values)]
+        if not len(finite) or np.abs(finite).max() >= np.finfo(np.float32).max:
+            return None
+        error = np.abs(finite.astype(np.float32) - finite).max()
+        if error <= (finite.max() - finite.min()) * F4_TOLERANCE:
+            return values.astype(np.float32)
+    elif values.dtype.kind == "M":
+        # Date axes read numbers as epoch milliseconds, far smaller than ISO text
+        ms = values.astype("datetime64[ms]").astype(np.int64).astype(np.float64)
+        ms[np.isnat(values)] = np.nan
+        return ms
+    return None
+
+
+def _compact(fig):
+    for trace in fig.data:
+        for axis in ("x", "y"):
+            values = trace[axis] if axis in trace else None
+            if not isinstance(values, np.ndarray):
+                continue
+            compact = _compact_array(values)
+            if compact is None:
+                continue
+            trace[axis] = compact
+            if values.dtype.kind == "M":
+                # trace.xaxis is "x", "x2", ...; the layout key is xaxis, xaxis2, ...
+                fig.layout[f"{axis}axis{trace[axis + 'axis'][1:]}"].type = "date"
+    return fig
+
+
+@functools.cache
+def _frozen_figure_type():
+    import plotly.graph_objects as go
+
+    class FrozenFigure(go.Figure):
+        """A figure serialized once; st.plotly_chart reuses the stored dict."""
+
+        def __init__(self, spec: dict):
+            super().__init__()
+            self._spec = spec
+
+        def to_dict(self):
+            return self._spec
+
+    return FrozenFigure
+
+
+def freeze_figure(fig):
+    """Encode a figure's arrays once so redrawing it skips plotly's serializer."""
+    return _frozen_figure_type()(fig.to_dict())
+
+
+# -----------------------------
+# Figure cache
+# -----------------------------
+def build_figure(df, chart_type, x, y=None, color=None, bins=None):
+    """Build a plotly figure with its arrays in compact typed-array form.
+
+    Floats go out as f4 where that is visually lossless and datetimes as
+    epoch milliseconds on a date axis; plotly>=6 base64-encodes both.
+    """
+    import plotly.express as px
+
+    if chart_type == "Heatmap":
+        fig = px.imshow(df, text_auto=True)
+    else:
+        kwargs = {"x": x, "color": color}
+        if chart_type == "Histogram":
+            kwargs["nbins"] = bins
+        else:
+            kwargs["y"] = y
+        fig = getattr(px, CHART_BUILDERS[chart_type])(df, **kwargs)
+
+    return _compact(fig)
+
+
+def cached_figure(cache: LRUCache, version, df, chart_type, x=None, y=None,
+                  color=None, bins=None):
+    """Return a frozen figure, rebuilding only when the chart spec or data changes.
+
+    `df` may be a zero-argument callable so the data is only produced on a miss.
+    """
+    key = (version, chart_type, x, y, color, bins)
+
+    fig = cache.get(key)
+    if fig is None:
+        if callable(df):
+            df = df()
+        fig = freeze_figure(build_figure(df, chart_type, x, y, color, bins))
+        cache.put(key, fig)
+    return fig
@@ -0,0 +1,134 @@
+import math
+import re
+from datetime import date, datetime
+
+from cache_utils import LRUCache
+
+# -----------------------------
+# Parameter parsing
+# -----------------------------
+# `:name` placeholders; `::` casts, quoted literals/identifiers and
+# comments are left alone
+PARAM_PATTERN = re.compile(r"(?<![:\w]):([A-Za-z_]\w*)")
+NON_CODE = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*"|--[^\n]*|/\*.*?(?:\*/|$))""", re.S)
+
+PARAM_TYPES = ["text", "int", "float", "date"]
+
+BUILTIN_TEMPLATES = {
+    "Preview N rows": {
+        "sql": "SELECT * FROM data LIMIT :limit",
+        "params": {"limit": "int"}
+    }
+}
+
+
+def _split_literals(sql: str):
+    # Even indices are SQL code, odd indices are literals, quoted
+    # identifiers and comments
+    return NON_CODE.split(sql)
+
+
+def find_params(sql: str):
+    params = []
+    for i, part in enumerate(_split_literals(sql)):
+        if i % 2:
+            continue
+        for name in PARAM_PATTERN.findall(part):
+            if name not in params:
+                params.append(name)
+    return params
+
+
+def guess_param_type(name: str):
+    if name.endswith("date") or name.endswith("_day"):
+        return "date"
+    if name in ("limit", "n", "top") or name.endswith("_count"):
+        return "int"
+    return "text"
+
+
+def to_prepared_sql(sql: str):
+    # Positional $1..$n in find_params() order; names such as `limit` are
+    # reserved words and cannot be used as EXECUTE argument names
+    positions = {name: i for i, name in enumerate(find_params(sql), 1)}
+    parts = _split_literals(sql)
+    for i in range(0, len(parts), 2):
+        parts[i] = PARAM_PATTERN.sub(lambda m: f"${positions[m.group(1)]}", parts[i])
+    return "".join(parts)
+
+
+# -----------------------------
+# Typed values
+# -----------------------------
+def coerce_param(value, param_type: str):
+    if param_type == "int":
+        return int(value)
+    if param_type == "float":
+        return float(value)
+    if param_type == "date":
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        return date.fromisoformat(str(value))
+    return str(value)
+
+
+def sql_literal(value, param_type: str):
+    value = coerce_param(value, param_type)
+
+    if param_type == "float" and not math.isfinite(value):
+        return f"CAST('{value}' AS DOUBLE)"
+    if param_type in ("int", "float"):
+        return repr(value)
+    if param_type == "date":
+        return f"DATE '{value.isoformat()}'"
+
+    escaped = value.replace("'", "''")
+    return f"'{escaped}'"
+
+
+# -----------------------------
+# Prepared statement execution
+# -----------------------------
+def prepare_template(con, prepared: dict, sql: str):
+    """Return the name of a prepared statement for `sql`, preparing it once."""
+    if sql in prepared:
+        return prepared[sql]
+
+    name = f"tpl_{len(prepared) + 1}"
+    con.execute(f"PREPARE {name} AS {to_prepared_sql(sql)}")
+    prepared[sql] = name
+    return name
+
+
+def execute_template(con, prepared: dict, template: dict, values: dict):
+    sql = template["sql"]
+    stmt = prepare_template(con, prepared, sql)
+
+    # EXECUTE does not accept bound parameters, so arguments are typed literals
+    args = ", ".join(
+        sql_literal(values[name], template["params"][name])
+        for name in find_params(sql)
+    )
+    # A template without parameters takes no argument list at all
+    return con.execute(f"EXECUTE {stmt}({args})" if args else f"EXECUTE {stmt}").df()
+
+
+def cached_execute(con, prepared: dict, cache: LRUCache, data_version,
+                   template: dict, values: dict):
+    """Run a template, reusing results for an already-seen parameter tuple."""
+    key = (
+        data_version,
+        template["sql"],
+        tuple(
+            (name, str(coerce_param(values[name], template["params"][name])))
+            for name in find_params(template["sql"])
+        )
+    )
+
+    result = cache.get(key)
+    if result is None:
+        result = execute_template(con, prepared, template, values)
+        cache.put(key, result)
+    return result
@@ -0,0 +1,3 @@
+def quote_ident(name: str):
+    """Quote a column or table name for DuckDB SQL."""
+    return '"' + str(name).replace('"', '""') + '"'
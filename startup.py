@@ -0,0 +1,57 @@
+import importlib
+import os
+import threading
+
+import streamlit as st
+
+# -----------------------------
+# Lazy heavy modules
+# -----------------------------
+# Imported on first use by the apps; warm_up() can preload them early.
+# plotly.graph_objects is not listed: `import streamlit` already loads it
+HEAVY_MODULES = [
+    "duckdb",
+    "plotly.express"
+]
+
+_warm_up_started = False
+_warm_up_lock = threading.Lock()
+
+
+def warm_up(modules=HEAVY_MODULES):
+    """Import heavy modules in a background thread, once per process.
+
+    Called after the first page elements are sent, so the upload page is
+    interactive while plotly.express/duckdb load. Set DATASENSE_WARMUP=0 to disable.
+    Returns the started thread (None if disabled or already started) so
+    short-lived callers can join it before exiting.
+    """
+    global _warm_up_started
+
+    if os.environ.get("DATASENSE_WARMUP", "1") == "0":
+        return None
+
+    with _warm_up_lock:
+        if _warm_up_started:
+            return None
+        _warm_up_started = True
+
+    def _import_all():
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass
+
+    thread = threading.Thread(target=_import_all, name="datasense-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def duckdb_connection(key="con"):
+    """Return the session's in-memory DuckDB connection, creating it on first use."""
+    if key not in st.session_state:
+        import duckdb
+
+        st.session_state[key] = duckdb.connect(database=":memory:")
+    return st.session_state[key]
@@ -0,0 +1,110 @@
+"""CrossfilterIndex aggregates must match a brute-force pandas recount."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from crossfilter import CrossfilterIndex, OTHER_LABEL
+
+N_ROWS = 5_003
+
+
+@pytest.fixture(scope="module")
+def df():
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({
+        # Rounded so many rows sit exactly on bin edges and range bounds
+        "x": np.round(rng.normal(0, 1, N_ROWS), 1),
+        "n": rng.integers(0, 50, N_ROWS),
+        # More categories than MAX_CATEGORIES, two of them named like the lump
+        "cat": rng.choice(["Other", OTHER_LABEL] + [f"c{i}" for i in range(40)], N_ROWS),
+        "flag": rng.choice([True, False], N_ROWS),
+        "when": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 90 * 24, N_ROWS), unit="h")
+    })
+    df.loc[::13, "x"] = np.nan
+    df.loc[::17, "cat"] = None
+    df.loc[::19, "when"] = pd.NaT
+    return df
+
+
+@pytest.fixture(scope="module")
+def xf(df):
+    return CrossfilterIndex(df, list(df.columns))
+
+
+def _labels(df, xf, col):
+    # Row labels as the index sees them: a top category, the lump or missing
+    index = xf.indexes[col]
+    values = df[col].map(lambda value: None if pd.isna(value) else str(value))
+    if values.nunique() == len(index.labels):
+        return values
+    top = set(index.labels[:-1])
+    return values.where(values.isna() | values.isin(top), index.labels[-1])
+
+
+def _keep(df, xf, selections, exclude=None):
+    keep = pd.Series(True, index=df.index)
+    for col, selection in selections.items():
+        if col == exclude or not selection:
+            continue
+        index = xf.indexes[col]
+        if index.kind == "numeric":
+            values = df[col]
+            if index.is_datetime:
+                values = values.astype("datetime64[ns]").astype("int64").where(values.notna())
+            keep &= values.between(*selection)
+        else:
+            keep &= _labels(df, xf, col).isin(selection)
+    return keep
+
+
+def _expected(df, xf, selections, col):
+    keep = _keep(df, xf, selections, exclude=col)
+    index = xf.indexes[col]
+    if index.kind == "numeric":
+        values = df.loc[keep, col].dropna()
+        if index.is_datetime:
+            values = values.astype("datetime64[ns]").astype("int64")
+        codes = np.clip(np.searchsorted(index.edges, values.to_numpy(float), side="right"),
+                        1, len(index.edges) - 1)
+        return np.bincount(codes, minlength=len(index.edges))[1:]
+    counts = _labels(df, xf, col)[keep].value_counts()
+    return np.array([counts.get(label, 0) for label in index.labels])
+
+
+def _ns(text):
+    return float(pd.Timestamp(text).value)
+
+
+SELECTIONS = [
+    {},
+    {"x": (-0.5, 0.7)},
+    {"x": (0.1, 0.1)},
+    {"x": (-9.0, 9.0), "n": (3, 40)},
+    {"n": (10, 10), "flag": ("True",)},
+    {"x": (-1.0, 1.0), "cat": ("c1", "Other", "c5")},
+    {"when": (_ns("2024-02-01"), _ns("2024-02-15 06:00")), "cat": ("c2",)},
+    {"x": (0.0, 2.0), "n": (5, 25), "flag": ("False",), "when": (_ns("2024-01-10"), _ns("2024-03-01"))}
+]
+
+
+def test_other_label_does_not_collide(xf):
+    labels = xf.indexes["cat"].labels
+    assert len(labels) == len(set(labels))
+    assert labels[-1] not in {"Other", OTHER_LABEL}
+
+
+def test_datetime_columns_are_indexed_numerically(xf):
+    assert xf.indexes["when"].kind == "numeric"
+    assert xf.indexes["when"].is_datetime
+
+
+@pytest.mark.parametrize("selections", SELECTIONS)
+def test_aggregates_match_brute_force(df, xf, selections):
+    for col in xf.indexes:
+        result = xf.aggregate(col, selections)["count"].to_numpy()
+        np.testing.assert_array_equal(result, _expected(df, xf, selections, col), err_msg=col)
+
+
+@pytest.mark.parametrize("selections", SELECTIONS)
+def test_count_matches_brute_force(df, xf, selections):
+    assert xf.count(selections) == int(_keep(df, xf, selections).sum())
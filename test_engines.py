@@ -0,0 +1,125 @@
+"""The pandas, DuckDB and Polars engines must agree on the same frame."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from engines import make_engine
+
+ENGINES = ["pandas", "DuckDB", "Polars"]
+
+FILTERS = [
+    [],
+    [("range", "num", 1.0, 3.5)],
+    [("isin", "cat", ("a", "b"))],
+    [("range", "num", 1.0, 3.5), ("isin", "cat", ("a", "b"))],
+    [("isin", "flag", (True,))],
+    [("isin", "mixed", ("x",))],
+    [("isin", "cat", ())]
+]
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        "num": [1.0, 2.5, np.nan, 3.5, 4.0, 1.5, np.nan, 2.0],
+        "count": [3, 1, 4, 1, 5, 9, 2, 6],
+        "cat": ["a", "b", None, "a", "c", "b", "a", None],
+        "when": pd.to_datetime([
+            "2024-01-01", "2024-01-02", None, "2024-01-04",
+            "2024-01-05", None, "2024-01-07", "2024-01-08"
+        ]),
+        "flag": [True, False, True, True, False, False, True, False],
+        # Mixed Excel cells: Arrow-based engines read this column as text
+        "mixed": pd.Series([1, "x", 2.5, None, "x", 7, None, "y"], dtype=object)
+    })
+
+
+@pytest.fixture
+def engines(df):
+    pytest.importorskip("polars")
+    duckdb = pytest.importorskip("duckdb")
+    con = duckdb.connect(database=":memory:")
+    yield {name: make_engine(name, df, con=con) for name in ENGINES}
+    con.close()
+
+
+def _rows(engine):
+    df = engine.to_pandas()
+    df = df.astype({"num": float, "count": "int64", "cat": object, "flag": bool})
+    df["when"] = pd.to_datetime(df["when"]).astype("datetime64[ns]")
+    df["cat"] = df["cat"].where(df["cat"].notna(), None)
+    df["mixed"] = df["mixed"].map(lambda value: None if pd.isna(value) else str(value)).astype(object)
+    return df.sort_values(["count", "num"]).reset_index(drop=True)
+
+
+def _numbers(frame):
+    return frame.apply(pd.to_numeric, errors="coerce").astype(float)
+
+
+def _value(value):
+    # numpy / python datetimes compare equal once normalized; the rest by text
+    # (a mixed column holds 1 in pandas and "1" in DuckDB/Polars)
+    if hasattr(value, "isoformat") or isinstance(value, np.datetime64):
+        return pd.Timestamp(value)
+    return str(value.item() if isinstance(value, np.generic) else value)
+
+
+def _option(option):
+    if option[0] == "range":
+        return ("range", *(float(value) for value in option[1:]))
+    return ("isin", {_value(value) for value in option[1]})
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_filter_and_counts_agree(engines, filters):
+    expected = engines["pandas"].filter(filters)
+    for name, engine in engines.items():
+        filtered = engine.filter(filters)
+        assert filtered.row_count() == expected.row_count(), name
+        pd.testing.assert_frame_equal(_rows(filtered), _rows(expected), obj=name)
+        pd.testing.assert_series_equal(
+            filtered.missing_counts().astype("int64"),
+            expected.missing_counts().astype("int64"),
+            check_names=False, obj=name
+        )
+        pd.testing.assert_series_equal(
+            filtered.unique_counts().astype("int64"),
+            expected.unique_counts().astype("int64"),
+            check_names=False, obj=name
+        )
+
+
+def test_describe_agrees(engines):
+    expected = engines["pandas"].describe()
+    for name, engine in engines.items():
+        result = engine.describe()
+        assert list(result.index) == list(expected.index), name
+        assert list(result.columns) == list(expected.columns), name
+
+        numeric = engine.numeric_columns()
+        pd.testing.assert_frame_equal(
+            _numbers(result.loc[numeric]), _numbers(expected.loc[numeric]), obj=name
+        )
+        others = [col for col in expected.index if col not in numeric]
+        pd.testing.assert_frame_equal(
+            _numbers(result.loc[others, ["count", "unique"]]),
+            _numbers(expected.loc[others, ["count", "unique"]]),
+            obj=name
+        )
+
+
+def test_corr_agrees(engines):
+    expected = engines["pandas"].corr()
+    for name, engine in engines.items():
+        pd.testing.assert_frame_equal(
+            engine.corr().astype(float), expected.astype(float), obj=name
+        )
+
+
+def test_filter_options_agree(engines):
+    expected = {col: _option(option)
+                for col, option in engines["pandas"].filter_options().items()}
+    for name, engine in engines.items():
+        options = {col: _option(option)
+                   for col, option in engine.filter_options().items()}
+        assert options == expected, name
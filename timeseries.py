@@ -0,0 +1,303 @@
+import warnings
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from sql_utils import quote_ident
+
+# -----------------------------
+# Resampling settings
+# -----------------------------
+# Roughly one bucket per pixel column of a wide chart
+MAX_BUCKETS = 1000
+
+# LTTB runs on raw rows up to this many, otherwise on a finer pre-aggregation
+LTTB_RAW_LIMIT = 200_000
+LTTB_OVERSAMPLE = 8
+
+# (time_bucket interval, approximate seconds), finest first. Neighbouring
+# rungs are at most 2.5x apart, so a span gets 400-1,000 buckets
+BUCKET_LADDER = [
+    ("1 second", 1),
+    ("2 seconds", 2),
+    ("5 seconds", 5),
+    ("10 seconds", 10),
+    ("15 seconds", 15),
+    ("30 seconds", 30),
+    ("1 minute", 60),
+    ("2 minutes", 120),
+    ("5 minutes", 300),
+    ("10 minutes", 600),
+    ("15 minutes", 900),
+    ("30 minutes", 1800),
+    ("1 hour", 3600),
+    ("2 hours", 7200),
+    ("3 hours", 10800),
+    ("6 hours", 21600),
+    ("12 hours", 43200),
+    ("1 day", 86400),
+    ("2 days", 172800),
+    ("3 days", 259200),
+    ("7 days", 604800),
+    ("14 days", 1209600),
+    ("1 month", 2592000),
+    ("2 months", 5184000),
+    ("3 months", 7776000),
+    ("6 months", 15552000),
+    ("1 year", 31536000),
+    ("2 years", 63072000),
+    ("5 years", 157680000),
+    ("10 years", 315360000)
+]
+
+MODES = ["Envelope (min/max/mean)", "LTTB"]
+
+
+def is_datetime_column(df: pd.DataFrame, col):
+    series = df[col]
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return True
+    # CSV text columns are `object` on pandas 2 and `str` on pandas 3
+    if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+        return False
+
+    sample = series.dropna().head(20)
+    if sample.empty:
+        return False
+    # pd.to_datetime would read plain numbers as epoch offsets
+    if not all(isinstance(value, (str, date)) for value in sample):
+        return False
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return bool(pd.to_datetime(sample, errors="coerce").notna().all())
+
+
+def is_timeseries(df: pd.DataFrame, x, y):
+    return (
+        y is not None
+        and is_datetime_column(df, x)
+        and pd.api.types.is_numeric_dtype(df[y])
+    )
+
+
+def choose_bucket(start, end, max_buckets=MAX_BUCKETS):
+    span = (pd.Timestamp(end) - pd.Timestamp(start)).total_seconds()
+    for interval, seconds in BUCKET_LADDER:
+        if span / seconds <= max_buckets:
+            return interval
+    return BUCKET_LADDER[-1][0]
+
+
+# -----------------------------
+# DuckDB queries
+# -----------------------------
+def _source_sql(table, x, y, color=None):
+    color_sql = f", {quote_ident(color)} AS series" if color else ""
+    return f"""
+SELECT
+    TRY_CAST({quote_ident(x)} AS TIMESTAMP) AS ts,
+    {quote_ident(y)} AS y{color_sql}
+FROM {quote_ident(table)}
+"""
+
+
+def time_bounds(con, table, x):
+    return con.execute(f"""
+SELECT MIN(ts), MAX(ts)
+FROM (SELECT TRY_CAST({quote_ident(x)} AS TIMESTAMP) AS ts FROM {quote_ident(table)})
+""").fetchone()
+
+
+def envelope_query(con, table, x, y, color, window, bucket):
+    series_sql = ", series" if color else ""
+    return con.execute(f"""
+SELECT
+    time_bucket(INTERVAL '{bucket}', ts) AS bucket{series_sql},
+    MIN(y) AS y_min,
+    MAX(y) AS y_max,
+    AVG(y) AS y_mean
+FROM ({_source_sql(table, x, y, color)})
+WHERE ts BETWEEN ? AND ? AND y IS NOT NULL
+GROUP BY ALL
+ORDER BY bucket
+""", list(window)).df()
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int):
+    """Largest-Triangle-Three-Buckets downsampling; returns kept indices."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    xs = x.astype("float64")
+    ys = y.astype("float64")
+
+    every = (n - 2) / (n_out - 2)
+    edges = (np.arange(n_out - 1) * every).astype(int) + 1
+    edges[-1] = n - 1
+
+    kept = [0]
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = xs[end:next_end].mean()
+        avg_y = ys[end:next_end].mean()
+
+        area = np.abs(
+            (xs[a] - avg_x) * (ys[start:end] - ys[a])
+            - (xs[a] - xs[start:end]) * (avg_y - ys[a])
+        )
+        a = start + int(area.argmax())
+        kept.append(a)
+
+    kept.append(n - 1)
+    return np.array(kept)
+
+
+def lttb_query(con, table, x, y, color, window, max_points):
+    source = _source_sql(table, x, y, color)
+    rows = con.execute(f"""
+SELECT COUNT(*) FROM ({source}) WHERE ts BETWEEN ? AND ? AND y IS NOT NULL
+""", list(window)).fetchone()[0]
+
+    series_sql = ", series" if color else ""
+    if rows <= LTTB_RAW_LIMIT:
+        points = con.execute(f"""
+SELECT ts AS bucket{series_sql}, y
+FROM ({source})
+WHERE ts BETWEEN ? AND ? AND y IS NOT NULL
+ORDER BY ts
+""", list(window)).df()
+    else:
+        # Too many rows to ship to Python: LTTB over finer bucket means instead
+        bucket = choose_bucket(*window, max_buckets=max_points * LTTB_OVERSAMPLE)
+        points = con.execute(f"""
+SELECT time_bucket(INTERVAL '{bucket}', ts) AS bucket{series_sql}, AVG(y) AS y
+FROM ({source})
+WHERE ts BETWEEN ? AND ? AND y IS NOT NULL
+GROUP BY ALL
+ORDER BY bucket
+""", list(window)).df()
+
+    groups = points.groupby("series", sort=False) if color else [(None, points)]
+    sampled = []
+    for _, group in groups:
+        kept = lttb(group["bucket"].to_numpy("datetime64[ns]").astype("int64"),
+                    group["y"].to_numpy(), max_points)
+        sampled.append(group.iloc[kept])
+
+    return pd.concat(sampled) if sampled else points
+
+
+# -----------------------------
+# Figure
+# -----------------------------
+def timeseries_figure(con, table, x, y, color, window, mode, max_points=MAX_BUCKETS):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    if mode == "LTTB":
+        data = lttb_query(con, table, x, y, color, window, max_points)
+        groups = data.groupby("series", sort=False) if color else [(y, data)]
+        for name, group in groups:
+            fig.add_trace(go.Scattergl(
+                x=group["bucket"], y=group["y"], mode="lines", name=str(name)
+            ))
+    else:
+        bucket = choose_bucket(*window, max_buckets=max_points)
+        data = envelope_query(con, table, x, y, color, window, bucket)
+        groups = data.groupby("series", sort=False) if color else [(y, data)]
+        for name, group in groups:
+            fig.add_trace(go.Scatter(
+                x=group["bucket"], y=group["y_max"], mode="lines",
+                line={"width": 0}, showlegend=False, hoverinfo="skip",
+                legendgroup=str(name)
+            ))
+            fig.add_trace(go.Scatter(
+                x=group["bucket"], y=group["y_min"], mode="lines",
+                line={"width": 0}, fill="tonexty", showlegend=False,
+                hoverinfo="skip", legendgroup=str(name)
+            ))
+            fig.add_trace(go.Scatter(
+                x=group["bucket"], y=group["y_mean"], mode="lines",
+                name=str(name), legendgroup=str(name)
+            ))
+
+    fig.update_layout(xaxis_title=x, yaxis_title=y, dragmode="select")
+    return fig
+
+
+def render_timeseries_chart(con, table, x, y, color=None, version=None,
+                            cache=None, key="timeseries", register=None):
+    """Draw a resampled time-series chart; box-select on it to zoom in.
+
+    `register`, if given, is called to (re)register `table` before the first
+    query, so nothing is materialized when the figure comes from `cache`.
+    """
+    def source():
+        nonlocal register
+        if register is not None:
+            register()
+            register = None
+        return con
+
+    bounds_key = (version, "TimeBounds", x)
+    full_window = cache.get(bounds_key) if cache is not None else None
+    if full_window is None:
+        full_window = tuple(time_bounds(source(), table, x))
+        if cache is not None:
+            cache.put(bounds_key, full_window)
+
+    if full_window[0] is None:
+        st.warning(f"No valid timestamps in column {x}.")
+        return
+
+    zoom_key = f"{key}_zoom"
+    # Bumped whenever the zoom changes, so the chart remounts without the
+    # consumed box and the same box can be drawn again later
+    generation_key = f"{key}_generation"
+    if st.session_state.get(zoom_key, (None, None))[:2] != (x, y):
+        st.session_state[zoom_key] = (x, y, None)
+    if generation_key not in st.session_state:
+        st.session_state[generation_key] = 0
+
+    col_mode, col_reset = st.columns([3, 1])
+    with col_mode:
+        mode = st.radio("Downsampling", MODES, horizontal=True, key=f"{key}_mode")
+    with col_reset:
+        if st.button("Reset zoom", key=f"{key}_reset"):
+            st.session_state[zoom_key] = (x, y, None)
+            st.session_state[generation_key] += 1
+
+    window = st.session_state[zoom_key][2] or full_window
+
+    cache_key = (version, "TimeSeries", x, y, color, (mode, window))
+    fig = cache.get(cache_key) if cache is not None else None
+    if fig is None:
+        fig = timeseries_figure(source(), table, x, y, color, window, mode)
+        if cache is not None:
+            cache.put(cache_key, fig)
+
+    if mode == "LTTB":
+        st.caption("LTTB downsampled · box-select to zoom in")
+    else:
+        st.caption(f"{choose_bucket(*window)} buckets · box-select to zoom in")
+
+    event = st.plotly_chart(
+        fig,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="box",
+        key=f"{key}_chart_{st.session_state[generation_key]}"
+    )
+
+    boxes = event.selection.get("box", []) if event else []
+    if boxes:
+        start, end = sorted(pd.to_datetime(boxes[0]["x"]))
+        st.session_state[zoom_key] = (x, y, (start.to_pydatetime(), end.to_pydatetime()))
+        st.session_state[generation_key] += 1
+        st.rerun()